@@ -2,13 +2,33 @@ import webview
 import threading
 import os
 import sys
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_from_directory
 from flask_cors import CORS
+from werkzeug.serving import make_server
 from llama_cpp import Llama
 import re
-from threading import Lock
+import json
+import queue
+from collections import deque
+from functools import lru_cache
 import time
-import socket
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
 
 # Get base path for PyInstaller
 def get_base_path():
@@ -19,15 +39,63 @@ def get_base_path():
 
 BASE_PATH = get_base_path()
 
+def get_env_int(name, default):
+    """Read a positive integer tuning knob from the environment"""
+    try:
+        value = int(os.environ.get(name, ''))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+# Leave one core free for Flask and the webview
+N_THREADS = get_env_int('R3KON_THREADS', max(1, (os.cpu_count() or 8) - 1))
+# Lower this when serving concurrent chats so their decoding doesn't
+# oversubscribe the CPU; prefill always uses N_THREADS
+N_DECODE_THREADS = get_env_int('R3KON_DECODE_THREADS', N_THREADS)
+N_BATCH = get_env_int('R3KON_BATCH', 2048)
+N_UBATCH = min(512, N_BATCH)
+N_CTX = 3072
+# Tokens kept free so the prompt plus the reply never quite fills the context
+CONTEXT_MARGIN = 32
+# Number of model contexts serving chat requests concurrently
+POOL_SIZE = get_env_int('R3KON_POOL_SIZE', 2)
+# HTTP worker threads. Each streaming chat holds one for its whole reply,
+# and at most POOL_SIZE chats run at once, so the rest stay free for
+# /api/status and page loads.
+SERVER_THREADS = POOL_SIZE + 4
+# Seconds a chat waits for a busy context, e.g. one finishing a cancelled reply
+CHAT_WAIT_TIMEOUT = 5
+
+# Known model files, smallest first. Generation on CPU is limited by memory
+# bandwidth, so the 3-bit quant is roughly 1.5-2x faster and uses ~25% less
+# RAM than Q4_K_M, at the cost of ~0.3-0.5 perplexity. Set R3KON_QUANT to
+# pick one explicitly.
+MODEL_FILES = {
+    "q3_k_s": "qwen1.5-1.8b-chat-q3_k_s.gguf",
+    "q4_k_m": "qwen1.5-1.8b-chat-q4_k_m.gguf",
+}
+
 # Flask app
 app = Flask(__name__, static_folder='.', static_url_path='')
 CORS(app)
+# Key order doesn't matter to the UI, skip sorting on every response
+if hasattr(app, 'json'):
+    app.json.sort_keys = False
+else:
+    app.config['JSON_SORT_KEYS'] = False
 
 # Global variables
 llm = None
+llm_pool = queue.Queue()
+chat_executor = None
+chat_slots = None
+system_tokens = []
 model_loaded = False
-model_lock = Lock()
 flask_started = False
+flask_ready = threading.Event()
+# Covers model loading and warm-up, which both happen before the server starts
+STARTUP_TIMEOUT = 60
+server_port = None
 
 SYSTEM_PROMPT = """You are R3KON GPT, a professional cybersecurity assistant.
 CRITICAL RULES:
@@ -39,50 +107,202 @@ CRITICAL RULES:
 6. If asked something off-topic, politely redirect to cybersecurity topics.
 """
 
-def find_free_port():
-    """Find a free port to use"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
+# Cut generation off when the model starts writing the next turn. "User:"
+# also covers "\n\nUser:", the newlines are stripped from the reply anyway.
+STOP_SEQUENCES = ["User:", "Assistant:"]
+
+# Patterns used to clean up model output
+CJK_RE = re.compile(r'[\u4e00-\u9fff]+')
+
+def cjk_stats(text):
+    """Return (CJK characters, characters excluding spaces and newlines)"""
+    cjk = sum(match.end() - match.start() for match in CJK_RE.finditer(text))
+    total = len(text) - text.count(' ') - text.count('\n')
+    return cjk, total
+
+def clean_reply(text):
+    """Filter non-English output and repeated lines from a raw model reply"""
+    text = text.strip()
+    
+    # Filter Chinese
+    chinese_chars, total_chars = cjk_stats(text)
+    if total_chars > 0 and (chinese_chars / total_chars) > 0.3:
+        return "I apologize, but I can only respond in English."
+    if chinese_chars:
+        text = CJK_RE.sub('', text).strip()
+    
+    # Remove repetition. Blank lines are dropped here too, so there's no
+    # need to collapse runs of them beforehand.
+    unique_lines = []
+    recent = deque(maxlen=2)
+    for line in text.split('\n'):
+        if line.strip() and line not in recent:
+            unique_lines.append(line)
+            recent.append(line)
+    
+    text = '\n'.join(unique_lines)
+    
+    if len(text) < 10:
+        return "I encountered an issue. Please try rephrasing your question."
+    return text
+
+def get_available_memory():
+    """Return available RAM in bytes, or None if it can't be determined"""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    # MemAvailable counts reclaimable page cache, SC_AVPHYS_PAGES (MemFree)
+    # doesn't, so prefer it on Linux
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def get_model_dirs():
+    """Directories that may contain the model file, in search order"""
+    return [
+        os.path.join(BASE_PATH, "model"),
+        BASE_PATH,
+        os.path.join(os.path.dirname(sys.executable), "model"),
+        os.path.join(os.getcwd(), "model"),
+    ]
+
+def find_model_file(filenames):
+    """Return the path of the first of filenames found in the model directories"""
+    # One directory listing per location rather than a stat per candidate,
+    # which is noticeably cheaper on antivirus-scanned Windows folders
+    listings = []
+    for directory in get_model_dirs():
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            continue
+        listings.append((directory, names))
+    
+    for filename in filenames:
+        for directory, names in listings:
+            if filename in names:
+                return os.path.join(directory, filename)
+    return None
+
+def get_model_filenames():
+    """Model files to look for, most preferred first"""
+    preferred = os.environ.get('R3KON_QUANT', '').lower()
+    if preferred in MODEL_FILES:
+        order = [preferred] + [quant for quant in MODEL_FILES if quant != preferred]
+    else:
+        # Default to the smallest quant that is available
+        order = list(MODEL_FILES)
+    return [MODEL_FILES[quant] for quant in order]
+
+def get_context_bytes(model_path):
+    """Estimate the f16 KV cache size of one context, or None if unknown"""
+    # A vocab-only load reads the GGUF metadata without the weights
+    try:
+        probe = Llama(model_path=model_path, vocab_only=True, verbose=False)
+        metadata = probe.metadata
+        del probe
+    except Exception as e:
+        print(f"WARNING: Could not read model metadata: {e}")
+        return None
+    try:
+        arch = metadata['general.architecture']
+        n_layer = int(metadata[f'{arch}.block_count'])
+        n_embd = int(metadata[f'{arch}.embedding_length'])
+        n_head = int(metadata.get(f'{arch}.attention.head_count', 1))
+        n_head_kv = int(metadata.get(f'{arch}.attention.head_count_kv', n_head))
+    except (KeyError, ValueError):
+        return None
+    # K and V, per layer, per position, 2 bytes each
+    return 2 * n_layer * N_CTX * (n_embd * n_head_kv // n_head) * 2
 
 def load_model():
     """Load the AI model"""
-    global llm, model_loaded
+    global llm, model_loaded, chat_executor, chat_slots, system_tokens
     
     try:
         # Find model in multiple locations
-        model_filename = "qwen1.5-1.8b-chat-q4_k_m.gguf"
-        possible_paths = [
-            os.path.join(BASE_PATH, "model", model_filename),
-            os.path.join(BASE_PATH, model_filename),
-            os.path.join(os.path.dirname(sys.executable), "model", model_filename),
-            os.path.join(os.getcwd(), "model", model_filename),
-        ]
-        
-        model_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                model_path = path
-                break
+        model_filenames = get_model_filenames()
+        model_path = find_model_file(model_filenames)
         
         if not model_path:
             print(f"ERROR: Model not found at any location")
-            print(f"Searched: {possible_paths}")
+            print(f"Searched for {model_filenames} in: {get_model_dirs()}")
             return False
         
         print(f"Loading model from: {model_path}")
+        print(f"Using {N_THREADS} threads, batch size {N_BATCH}")
         
-        llm = Llama(
-            model_path=model_path,
-            n_ctx=3072,
-            n_threads=8,
-            n_batch=512,
-            verbose=False,
-            use_mlock=True,
-            use_mmap=True,
+        # mmap is slower than a plain read on Apple Silicon
+        use_mmap = sys.platform != 'darwin'
+        
+        # Contexts share the mmap'd weights, so each extra one only costs
+        # its KV cache. Without mmap every context would hold its own copy.
+        pool_size = POOL_SIZE if use_mmap else 1
+        available = get_available_memory()
+        model_size = os.path.getsize(model_path)
+        context_bytes = get_context_bytes(model_path)
+        if context_bytes is None:
+            # Can't tell how much each context costs, so don't multiply it
+            pool_size = 1
+            context_bytes = 0
+        elif available is not None:
+            # Drop contexts that wouldn't fit next to the weights
+            while pool_size > 1 and model_size + pool_size * context_bytes > available:
+                pool_size -= 1
+        
+        # Only pin the model in RAM when it comfortably fits alongside the
+        # contexts' KV caches, otherwise mlock pushes everything else into
+        # swap on small machines
+        use_mlock = (
+            available is not None
+            and available > 2 * model_size + pool_size * context_bytes
         )
+        print(f"mlock: {use_mlock}, mmap: {use_mmap}")
+        instances = []
+        for _ in range(pool_size):
+            instance = Llama(
+                model_path=model_path,
+                n_ctx=N_CTX,
+                n_threads=N_DECODE_THREADS,
+                n_threads_batch=N_THREADS,
+                n_batch=N_BATCH,
+                n_ubatch=N_UBATCH,
+                verbose=False,
+                use_mlock=use_mlock,
+                use_mmap=use_mmap,
+            )
+            instances.append(instance)
+        llm = instances[0]
+        print(f"Created {pool_size} model context(s), {N_DECODE_THREADS} decode threads each")
+        
+        # The system prompt never changes, so tokenize it once. Every prompt
+        # then starts with the same tokens and llama.cpp reuses their KV
+        # cache from the previous call on that context instead of re-prefilling.
+        system_tokens = llm.tokenize(SYSTEM_PROMPT.encode('utf-8'))
+        
+        # Warm up: evaluating the system prompt runs a forward pass over every
+        # weight tensor, faulting the mmap'd pages in now rather than during
+        # the first chat, and leaves the prompt in each context's KV cache.
+        # The server only starts accepting requests once this is done.
+        print("Warming up model...")
+        for instance in instances:
+            instance.eval(system_tokens)
+            llm_pool.put(instance)
+        
+        # One generation worker per context
+        chat_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='r3kon-gen')
+        # Chats no longer queue up in the executor, each holding a server
+        # thread for as long as it waits. A chat waits at most
+        # CHAT_WAIT_TIMEOUT for a free context and is then turned away.
+        chat_slots = threading.BoundedSemaphore(pool_size)
         
         model_loaded = True
         print("Model loaded successfully!")
@@ -94,35 +314,60 @@ def load_model():
         traceback.print_exc()
         return False
 
-def generate_response(prompt, config, history):
-    """Generate response from model"""
+@lru_cache(maxsize=256)
+def tokenize_fragment(text):
+    """Tokenize part of a prompt, caching it since history turns repeat"""
+    return tuple(llm.tokenize(text.encode('utf-8'), add_bos=False))
+
+def generate_response(prompt, config, history, on_token=None, cancelled=None):
+    """Generate response from model
+    
+    on_token is called with each raw text chunk as it is generated, and
+    generation stops early once the cancelled event is set.
+    """
     if not model_loaded:
         return {"error": "Model not loaded"}
     
-    # Build context
-    context_parts = [SYSTEM_PROMPT]
-    
-    if config.get('sessionMemory') and history:
-        context_parts.append("\n--- Recent Conversation ---")
-        for turn in history[-5:]:
-            context_parts.append(f"User: {turn['user']}")
-            context_parts.append(f"Assistant: {turn['assistant']}")
-    
-    context_parts.append(f"\nUser: {prompt}")
-    context_parts.append("Assistant:")
-    
-    full_prompt = '\n'.join(context_parts)
-    
     # Token limits
     token_limits = {"short": 300, "medium": 600, "long": 1000}
     max_tokens = token_limits.get(config.get('responseLength', 'medium'), 600)
     
+    # Build context after the pre-tokenized system prompt
+    question_tokens = tokenize_fragment(f"\n\nUser: {prompt}\nAssistant:")
+    budget = N_CTX - len(system_tokens) - len(question_tokens) - max_tokens - CONTEXT_MARGIN
+    
+    # Keep the newest turns that fit. Dropping old turns here stops
+    # llama.cpp from truncating the front of the prompt, which is where
+    # the system prompt lives.
+    history_tokens = []
+    if config.get('sessionMemory') and history:
+        header_tokens = tokenize_fragment("\n\n--- Recent Conversation ---")
+        budget -= len(header_tokens)
+        kept_turns = []
+        for turn in reversed(history[-5:]):
+            turn_tokens = tokenize_fragment(f"\nUser: {turn['user']}\nAssistant: {turn['assistant']}")
+            if len(turn_tokens) > budget:
+                break
+            budget -= len(turn_tokens)
+            kept_turns.append(turn_tokens)
+        
+        if kept_turns:
+            history_tokens.extend(header_tokens)
+            for turn_tokens in reversed(kept_turns):
+                history_tokens.extend(turn_tokens)
+    
+    prompt_tokens = system_tokens + history_tokens + list(question_tokens)
+    
     try:
-        with model_lock:
-            response = llm(
-                full_prompt,
+        # Contexts aren't thread-safe, so each request checks one out
+        # of the pool for the duration of the call
+        instance = llm_pool.get()
+        try:
+            chunks = []
+            completion = instance(
+                prompt_tokens,
                 max_tokens=max_tokens,
-                stop=["User:", "\n\nUser:", "Assistant:"],
+                stop=STOP_SEQUENCES,
                 echo=False,
                 temperature=0.7,
                 top_p=0.9,
@@ -130,31 +375,27 @@ def generate_response(prompt, config, history):
                 repeat_penalty=1.2,
                 frequency_penalty=0.3,
                 presence_penalty=0.3,
+                stream=True,
             )
+            try:
+                for chunk in completion:
+                    text = chunk["choices"][0]["text"]
+                    chunks.append(text)
+                    if on_token:
+                        # Keep CJK out of the live view too, clean_reply
+                        # still decides on the final reply
+                        text = CJK_RE.sub('', text)
+                        if text:
+                            on_token(text)
+                    if cancelled is not None and cancelled.is_set():
+                        break
+            finally:
+                # Finish a cancelled stream before the context is reused
+                completion.close()
+        finally:
+            llm_pool.put(instance)
         
-        bot_reply = response["choices"][0]["text"].strip()
-        
-        # Filter Chinese
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', bot_reply))
-        total_chars = len(bot_reply.replace(' ', '').replace('\n', ''))
-        
-        if total_chars > 0 and (chinese_chars / total_chars) > 0.3:
-            bot_reply = "I apologize, but I can only respond in English."
-        else:
-            bot_reply = re.sub(r'[\u4e00-\u9fff]+', '', bot_reply)
-            bot_reply = re.sub(r'\n\n+', '\n\n', bot_reply).strip()
-        
-        # Remove repetition
-        lines = bot_reply.split('\n')
-        unique_lines = []
-        for line in lines:
-            if line.strip() and (not unique_lines or line not in unique_lines[-2:]):
-                unique_lines.append(line)
-        
-        bot_reply = '\n'.join(unique_lines)
-        
-        if len(bot_reply) < 10:
-            bot_reply = "I encountered an issue. Please try rephrasing your question."
+        bot_reply = clean_reply(''.join(chunks))
         
         return {"response": bot_reply}
         
@@ -162,641 +403,31 @@ def generate_response(prompt, config, history):
         print(f"Error generating response: {e}")
         return {"error": str(e)}
 
+def find_ui_dir():
+    """Return the directory holding index.html, or None if it's missing"""
+    # When frozen, BASE_PATH is the PyInstaller bundle, which only contains
+    # index.html if the build added it (see README). Fall back to a copy
+    # shipped next to the executable, like the model folder.
+    candidate_dirs = [
+        BASE_PATH,
+        os.path.dirname(sys.executable),
+        os.getcwd(),
+    ]
+    for directory in candidate_dirs:
+        if os.path.isfile(os.path.join(directory, 'index.html')):
+            return directory
+    return None
+
+UI_DIR = find_ui_dir()
+
 @app.route('/')
 def index():
     """Serve the HTML page"""
-    # Embed HTML directly to avoid path issues
-    html_content = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>R3KON GPT - Cybersecurity Assistant</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        :root {
-            --primary-bg: #0F0F0F;
-            --secondary-bg: #1A1A1A;
-            --sidebar-bg: #1E1E1E;
-            --input-bg: #2A2A2A;
-            --text-primary: #FFFFFF;
-            --text-secondary: #B0B0B0;
-            --accent-blue: #00D4FF;
-            --accent-green: #00FF9D;
-            --accent-yellow: #FFD700;
-            --accent-red: #FF4466;
-            --border-color: #333333;
-            --button-bg: #0078D4;
-            --button-hover: #005A9E;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: var(--primary-bg);
-            color: var(--text-primary);
-            height: 100vh;
-            overflow: hidden;
-        }
-
-        body.light-theme {
-            --primary-bg: #FFFFFF;
-            --secondary-bg: #F0F0F0;
-            --sidebar-bg: #E5E5E5;
-            --input-bg: #F5F5F5;
-            --text-primary: #000000;
-            --text-secondary: #666666;
-            --border-color: #CCCCCC;
-            --button-bg: #0078D4;
-            --button-hover: #005A9E;
-        }
-
-        .container {
-            display: flex;
-            height: 100vh;
-        }
-
-        .sidebar {
-            width: 250px;
-            background: var(--sidebar-bg);
-            border-right: 1px solid var(--border-color);
-            display: flex;
-            flex-direction: column;
-            padding: 20px;
-            overflow-y: auto;
-        }
-
-        .sidebar-title {
-            font-size: 18px;
-            font-weight: bold;
-            margin-bottom: 20px;
-            text-align: center;
-        }
-
-        .settings-section {
-            margin-bottom: 25px;
-        }
-
-        .settings-label {
-            font-size: 14px;
-            color: var(--text-secondary);
-            margin-bottom: 8px;
-            display: block;
-        }
-
-        .theme-buttons, .font-buttons {
-            display: flex;
-            gap: 8px;
-        }
-
-        .btn {
-            padding: 8px 12px;
-            border: 1px solid var(--text-primary);
-            border-radius: 4px;
-            background: transparent;
-            color: var(--text-primary);
-            cursor: pointer;
-            font-size: 13px;
-            font-weight: 500;
-            transition: all 0.3s;
-        }
-
-        .btn:hover {
-            background: var(--text-primary);
-            color: var(--primary-bg);
-            transform: translateY(-1px);
-        }
-
-        .btn-full {
-            width: 100%;
-            margin-top: 5px;
-        }
-
-        select, input[type="checkbox"] {
-            width: 100%;
-            padding: 8px;
-            background: var(--input-bg);
-            color: var(--text-primary);
-            border: 1px solid var(--border-color);
-            border-radius: 4px;
-            font-size: 13px;
-        }
-
-        .checkbox-container {
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            margin-top: 8px;
-        }
-
-        .checkbox-container input[type="checkbox"] {
-            width: auto;
-        }
-
-        .main-content {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-        }
-
-        .header {
-            background: var(--secondary-bg);
-            padding: 20px;
-            border-bottom: 2px solid var(--text-primary);
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }
-        
-        .header h1 {
-            font-size: 24px;
-            font-weight: bold;
-            color: var(--text-primary);
-            letter-spacing: 2px;
-            text-transform: uppercase;
-        }
-
-        .header p {
-            color: var(--text-secondary);
-            font-size: 14px;
-        }
-
-        .chat-container {
-            flex: 1;
-            overflow-y: auto;
-            padding: 20px;
-            background: var(--primary-bg);
-        }
-
-        .message {
-            margin-bottom: 20px;
-            animation: fadeIn 0.3s;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-
-        .message-header {
-            font-weight: bold;
-            margin-bottom: 5px;
-            font-size: 14px;
-            color: var(--text-primary);
-        }
-
-        .user-message .message-header {
-            color: var(--text-primary);
-        }
-
-        .assistant-message .message-header {
-            color: var(--text-primary);
-        }
-
-        .system-message .message-header {
-            color: var(--text-secondary);
-            font-style: italic;
-        }
-
-        .message-content {
-            padding: 12px;
-            border-radius: 8px;
-            background: var(--secondary-bg);
-            border: 1px solid var(--border-color);
-            line-height: 1.6;
-            white-space: pre-wrap;
-        }
-        
-        .user-message .message-content {
-            border-left: 3px solid var(--text-primary);
-        }
-        
-        .assistant-message .message-content {
-            border-left: 3px solid var(--text-secondary);
-            background: var(--input-bg);
-        }
-        
-        .system-message .message-content {
-            border-left: 3px solid var(--accent-secondary);
-            font-style: italic;
-            color: var(--text-secondary);
-        }
-
-        .thinking {
-            color: var(--text-secondary);
-            font-style: italic;
-            animation: pulse 1.5s infinite;
-        }
-
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-
-        .quick-commands {
-            padding: 10px 20px;
-            background: var(--secondary-bg);
-            border-top: 1px solid var(--border-color);
-            display: flex;
-            gap: 10px;
-        }
-
-        .input-area {
-            padding: 20px;
-            background: var(--secondary-bg);
-            border-top: 1px solid var(--border-color);
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }
-
-        .input-field {
-            flex: 1;
-            padding: 12px;
-            background: var(--input-bg);
-            color: var(--text-primary);
-            border: 2px solid var(--border-color);
-            border-radius: 6px;
-            font-size: 14px;
-            outline: none;
-            transition: border-color 0.3s;
-        }
-        
-        .input-field:focus {
-            border-color: var(--text-primary);
-        }
-
-        .send-btn {
-            padding: 12px 30px;
-            background: var(--text-primary);
-            color: var(--primary-bg);
-            border: none;
-            border-radius: 6px;
-            cursor: pointer;
-            font-weight: bold;
-            font-size: 14px;
-            transition: all 0.3s;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-
-        .send-btn:hover {
-            background: var(--text-secondary);
-            transform: scale(1.02);
-        }
-
-        .send-btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-
-        .status-bar {
-            padding: 8px 20px;
-            background: var(--sidebar-bg);
-            border-top: 1px solid var(--border-color);
-            font-size: 12px;
-            color: var(--text-secondary);
-        }
-
-        ::-webkit-scrollbar {
-            width: 10px;
-        }
-
-        ::-webkit-scrollbar-track {
-            background: var(--primary-bg);
-        }
-
-        ::-webkit-scrollbar-thumb {
-            background: var(--border-color);
-            border-radius: 5px;
-        }
-
-        ::-webkit-scrollbar-thumb:hover {
-            background: #555;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <aside class="sidebar">
-            <div class="sidebar-title">SETTINGS</div>
-
-            <div class="settings-section">
-                <label class="settings-label">Theme:</label>
-                <div class="theme-buttons">
-                    <button class="btn" onclick="setTheme('dark')">Dark</button>
-                    <button class="btn" onclick="setTheme('light')">Light</button>
-                </div>
-            </div>
-
-            <div class="settings-section">
-                <label class="settings-label">Font Size:</label>
-                <div class="font-buttons">
-                    <button class="btn" onclick="adjustFontSize(-1)">A-</button>
-                    <button class="btn" onclick="adjustFontSize(1)">A+</button>
-                </div>
-            </div>
-
-            <div class="settings-section">
-                <label class="settings-label">Response Length:</label>
-                <select id="responseLength" onchange="updateSetting('responseLength', this.value)">
-                    <option value="short">Short</option>
-                    <option value="medium" selected>Medium</option>
-                    <option value="long">Long</option>
-                </select>
-            </div>
-
-            <div class="settings-section">
-                <label class="settings-label">Memory:</label>
-                <div class="checkbox-container">
-                    <input type="checkbox" id="sessionMemory" checked onchange="updateSetting('sessionMemory', this.checked)">
-                    <label for="sessionMemory">Session Memory</label>
-                </div>
-                <div class="checkbox-container">
-                    <input type="checkbox" id="persistentMemory" onchange="updateSetting('persistentMemory', this.checked)">
-                    <label for="persistentMemory">Persistent Memory</label>
-                </div>
-            </div>
-
-            <div class="settings-section">
-                <label class="settings-label">Quick Actions:</label>
-                <button class="btn btn-full" onclick="clearChat()">Clear Chat</button>
-                <button class="btn btn-full" onclick="exportChat()">Export Chat</button>
-                <button class="btn btn-full" onclick="clearMemory()">Clear Memory</button>
-            </div>
-        </aside>
-
-        <main class="main-content">
-            <header class="header">
-                <div>
-                    <h1>R3KON GPT</h1>
-                    <p>Professional Cybersecurity Assistant</p>
-                </div>
-            </header>
-
-            <div class="chat-container" id="chatContainer">
-                <div class="message system-message">
-                    <div class="message-header">System</div>
-                    <div class="message-content">Loading R3KON GPT model... Please wait.</div>
-                </div>
-            </div>
-
-            <div class="quick-commands">
-                <button class="btn" onclick="quickCommand('summarize')">Summarize</button>
-                <button class="btn" onclick="quickCommand('explain')">Explain Simply</button>
-            </div>
-
-            <div class="input-area">
-                <input 
-                    type="text" 
-                    id="userInput" 
-                    class="input-field" 
-                    placeholder="Type your message here..."
-                    onkeypress="handleKeyPress(event)"
-                    disabled
-                >
-                <button class="send-btn" id="sendBtn" onclick="sendMessage()" disabled>Send</button>
-            </div>
-
-            <div class="status-bar" id="statusBar">Initializing...</div>
-        </main>
-    </div>
-
-    <script>
-        let config = {
-            fontSize: 14,
-            theme: 'dark',
-            responseLength: 'medium',
-            sessionMemory: true,
-            persistentMemory: false
-        };
-
-        let conversationHistory = [];
-        let sessionMemory = [];
-        let modelLoaded = false;
-
-        function loadConfig() {
-            const saved = localStorage.getItem('rekon_config');
-            if (saved) {
-                config = { ...config, ...JSON.parse(saved) };
-                applyConfig();
-            }
-        }
-
-        function saveConfig() {
-            localStorage.setItem('rekon_config', JSON.stringify(config));
-        }
-
-        function applyConfig() {
-            document.body.style.fontSize = config.fontSize + 'px';
-            if (config.theme === 'light') {
-                document.body.classList.add('light-theme');
-            }
-            document.getElementById('responseLength').value = config.responseLength;
-            document.getElementById('sessionMemory').checked = config.sessionMemory;
-            document.getElementById('persistentMemory').checked = config.persistentMemory;
-        }
-
-        function setTheme(theme) {
-            config.theme = theme;
-            if (theme === 'light') {
-                document.body.classList.add('light-theme');
-            } else {
-                document.body.classList.remove('light-theme');
-            }
-            saveConfig();
-        }
-
-        function adjustFontSize(delta) {
-            config.fontSize = Math.max(10, Math.min(20, config.fontSize + delta));
-            document.body.style.fontSize = config.fontSize + 'px';
-            saveConfig();
-        }
-
-        function updateSetting(key, value) {
-            config[key] = value;
-            saveConfig();
-        }
-
-        function addMessage(sender, content, type = 'user') {
-            const chatContainer = document.getElementById('chatContainer');
-            const timestamp = new Date().toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' });
-            
-            const messageDiv = document.createElement('div');
-            messageDiv.className = `message ${type}-message`;
-            
-            const header = document.createElement('div');
-            header.className = 'message-header';
-            header.textContent = `${sender} [${timestamp}]:`;
-            
-            const contentDiv = document.createElement('div');
-            contentDiv.className = 'message-content';
-            contentDiv.textContent = content;
-            
-            messageDiv.appendChild(header);
-            messageDiv.appendChild(contentDiv);
-            chatContainer.appendChild(messageDiv);
-            
-            chatContainer.scrollTop = chatContainer.scrollHeight;
-        }
-
-        function showThinking() {
-            const chatContainer = document.getElementById('chatContainer');
-            const thinkingDiv = document.createElement('div');
-            thinkingDiv.id = 'thinking';
-            thinkingDiv.className = 'message thinking';
-            thinkingDiv.innerHTML = '<div class="message-content">R3KON GPT is thinking...</div>';
-            chatContainer.appendChild(thinkingDiv);
-            chatContainer.scrollTop = chatContainer.scrollHeight;
-            
-            updateStatus('Generating response...');
-        }
-
-        function removeThinking() {
-            const thinking = document.getElementById('thinking');
-            if (thinking) thinking.remove();
-            updateStatus('Ready');
-        }
-
-        function updateStatus(text) {
-            document.getElementById('statusBar').textContent = text;
-        }
-
-        async function sendMessage() {
-            const input = document.getElementById('userInput');
-            const message = input.value.trim();
-            
-            if (!message || !modelLoaded) return;
-            
-            addMessage('You', message, 'user');
-            conversationHistory.push({ role: 'user', content: message });
-            
-            input.value = '';
-            input.disabled = true;
-            document.getElementById('sendBtn').disabled = true;
-            
-            showThinking();
-            
-            try {
-                const response = await fetch('/api/chat', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        message: message,
-                        config: config,
-                        history: sessionMemory
-                    })
-                });
-                
-                const data = await response.json();
-                removeThinking();
-                
-                if (data.response) {
-                    addMessage('R3KON GPT', data.response, 'assistant');
-                    
-                    if (config.sessionMemory) {
-                        sessionMemory.push({ user: message, assistant: data.response });
-                        if (sessionMemory.length > 8) sessionMemory.shift();
-                    }
-                } else {
-                    addMessage('Error', 'Failed to get response from model.', 'system');
-                }
-            } catch (error) {
-                removeThinking();
-                addMessage('Error', `Connection error: ${error.message}`, 'system');
-            }
-            
-            input.disabled = false;
-            document.getElementById('sendBtn').disabled = false;
-            input.focus();
-        }
-
-        function handleKeyPress(event) {
-            if (event.key === 'Enter' && !event.shiftKey) {
-                event.preventDefault();
-                sendMessage();
-            }
-        }
-
-        function quickCommand(type) {
-            const commands = {
-                summarize: 'Summarize your last response in 2-3 bullet points.',
-                explain: 'Explain your last response in simpler terms.'
-            };
-            
-            if (conversationHistory.length < 2) {
-                alert('Please have a conversation first.');
-                return;
-            }
-            
-            document.getElementById('userInput').value = commands[type];
-            sendMessage();
-        }
-
-        function clearChat() {
-            if (confirm('Clear chat history?')) {
-                const chatContainer = document.getElementById('chatContainer');
-                chatContainer.innerHTML = '';
-                conversationHistory = [];
-                sessionMemory = [];
-                addMessage('System', 'Chat cleared. Ready for new conversation.', 'system');
-            }
-        }
-
-        function exportChat() {
-            const chatContainer = document.getElementById('chatContainer');
-            const messages = chatContainer.innerText;
-            const blob = new Blob([messages], { type: 'text/plain' });
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `rekon_chat_${Date.now()}.txt`;
-            a.click();
-            URL.revokeObjectURL(url);
-        }
-
-        function clearMemory() {
-            if (confirm('Clear all memory?')) {
-                sessionMemory = [];
-                localStorage.removeItem('rekon_memory');
-                alert('Memory cleared successfully.');
-            }
-        }
-
-        async function initialize() {
-            loadConfig();
-            
-            try {
-                const response = await fetch('/api/status');
-                const data = await response.json();
-                
-                if (data.modelLoaded) {
-                    modelLoaded = true;
-                    addMessage('System', 'Model loaded successfully! Ask me anything about cybersecurity.', 'system');
-                    document.getElementById('userInput').disabled = false;
-                    document.getElementById('sendBtn').disabled = false;
-                    updateStatus('Ready');
-                    document.getElementById('userInput').focus();
-                } else {
-                    addMessage('System', 'Model failed to load. Please check the console.', 'system');
-                    updateStatus('Error: Model not loaded');
-                }
-            } catch (error) {
-                addMessage('System', 'Cannot connect to backend. Make sure the server is running.', 'system');
-                updateStatus('Error: Backend not connected');
-            }
-        }
-
-        window.onload = initialize;
-    </script>
-</body>
-</html>'''
-    
-    return html_content
+    if UI_DIR is None:
+        return "R3KON GPT: index.html was not found next to the application.", 500
+    # send_from_directory hands the file to the server's file wrapper and
+    # takes care of ETag / 304 handling
+    return send_from_directory(UI_DIR, 'index.html', max_age=3600)
 
 @app.route('/api/status')
 def status():
@@ -806,9 +437,22 @@ def status():
         "status": "ready" if model_loaded else "loading"
     })
 
+def format_event(event, payload):
+    """Encode one Server-Sent Event with a JSON payload"""
+    if orjson is not None:
+        data = orjson.dumps(payload)
+    else:
+        data = json.dumps(payload).encode('utf-8')
+    return b'event: ' + event.encode('ascii') + b'\ndata: ' + data + b'\n\n'
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    """Handle chat requests"""
+    """Handle chat requests, streaming tokens back as Server-Sent Events
+    
+    Emits a "token" event per generated chunk followed by a single "done"
+    event carrying the cleaned-up response (or an error). Answers 503 when
+    no model context frees up within CHAT_WAIT_TIMEOUT seconds.
+    """
     if not model_loaded:
         return jsonify({"error": "Model not loaded"}), 500
     
@@ -821,39 +465,92 @@ def chat():
         if not message:
             return jsonify({"error": "No message"}), 400
         
-        result = generate_response(message, config, history)
-        return jsonify(result)
+        # The worker pushes (event, payload) pairs here as tokens arrive
+        events = queue.Queue()
+        cancelled = threading.Event()
+        
+        def run():
+            try:
+                result = generate_response(
+                    message, config, history,
+                    on_token=lambda text: events.put(('token', {"text": text})),
+                    cancelled=cancelled,
+                )
+            except Exception as e:
+                result = {"error": str(e)}
+            finally:
+                chat_slots.release()
+            events.put(('done', result))
+        
+        if not chat_slots.acquire(timeout=CHAT_WAIT_TIMEOUT):
+            return jsonify({"error": "Server busy, please try again"}), 503
+        try:
+            chat_executor.submit(run)
+        except Exception:
+            chat_slots.release()
+            raise
+        
+        def stream():
+            try:
+                while True:
+                    event, payload = events.get()
+                    yield format_event(event, payload)
+                    if event == 'done':
+                        break
+            finally:
+                # Client went away, stop generating for it
+                cancelled.set()
+        
+        return Response(
+            stream_with_context(stream()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
         return jsonify({"error": str(e)}), 500
 
-def start_flask(port):
+def create_server():
+    """Bind the HTTP server, returning (port, function that serves forever)"""
+    # Port 0 lets the OS pick a free port for the socket we keep,
+    # so nothing else can grab it between choosing and binding
+    if waitress is not None:
+        # Fixed worker pool, no per-request thread or access log line
+        server = waitress.create_server(app, host='127.0.0.1', port=0, threads=SERVER_THREADS)
+        return server.effective_port, server.run
+    
+    # Werkzeug's dev server logs every request to stderr
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    return server.server_port, server.serve_forever
+
+def start_flask():
     """Start Flask server in background"""
-    global flask_started
+    global flask_started, server_port
     try:
-        print(f"Starting Flask server on port {port}...")
+        print("Starting Flask server...")
+        if UI_DIR is None:
+            print("ERROR: index.html not found, the window will be empty")
         load_model()
+        server_port, serve = create_server()
+        print(f"Using port: {server_port}")
         flask_started = True
-        app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False, threaded=True)
+        # The socket is bound and listening, so requests can be accepted
+        flask_ready.set()
+        serve()
     except Exception as e:
         print(f"ERROR: Flask failed to start: {e}")
         import traceback
         traceback.print_exc()
         flask_started = False
+        # Wake up wait_for_flask so startup fails right away
+        flask_ready.set()
 
-def wait_for_flask(port, timeout=30):
+def wait_for_flask(timeout=STARTUP_TIMEOUT):
     """Wait for Flask to be ready"""
-    import urllib.request
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        try:
-            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/status', timeout=1)
-            print("Flask server is ready!")
-            return True
-        except:
-            time.sleep(0.5)
-    
+    if flask_ready.wait(timeout) and flask_started:
+        print("Flask server is ready!")
+        return True
     return False
 
 def main():
@@ -871,27 +568,24 @@ def main():
     print("R3KON GPT - Desktop Application")
     print("=" * 60)
     
-    # Find a free port
-    port = find_free_port()
-    print(f"Using port: {port}")
-    
     # Start Flask in background thread
     print("Starting backend server...")
-    flask_thread = threading.Thread(target=start_flask, args=(port,), daemon=True)
+    flask_thread = threading.Thread(target=start_flask, daemon=True)
     flask_thread.start()
     
     # Wait for Flask to be ready
     print("Waiting for server to start...")
-    if not wait_for_flask(port, timeout=30):
-        print("ERROR: Server failed to start within 30 seconds")
+    if not wait_for_flask():
+        print(f"ERROR: Server failed to start within {STARTUP_TIMEOUT} seconds")
         print("\nTroubleshooting:")
-        print("1. Check if model file exists in 'model' folder")
+        print("1. Check if a model file exists in 'model' folder")
         print("2. Make sure llama-cpp-python is installed")
         print("3. Check console for error messages above")
         # Don't use input() - just wait and exit
         time.sleep(5)
         return
     
+    port = server_port
     print("Server started successfully!")
     print(f"Opening window at http://127.0.0.1:{port}")
     